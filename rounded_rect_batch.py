@@ -0,0 +1,202 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import bpy # type: ignore
+
+# Creates rounded rectangles from a file of specifications in background
+# mode, without operators or a 3D view, then saves a .blend file:
+#
+#   blender -b -P rounded_rect_batch.py -- rects.jsonl rects.blend
+#
+# Each specification holds keyword arguments for create_rect_mesh or
+# create_rect_curve, plus an optional type (MESH or CURVE), name and
+# location (x, y, z).
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rounded_rect_curve import RndRectCurveMaker # noqa: E402
+from rounded_rect_mesh import RndRectMeshMaker # noqa: E402
+
+# CSV values are strings, so they are converted by key.
+FLOAT_KEYS = {
+    "lbx", "lby", "ubx", "uby",
+    "tl", "tr", "br", "bl",
+    "ins_top", "ins_rgt", "ins_btm", "ins_lft",
+    "extrude", "offset",
+    "x", "y", "z"}
+INT_KEYS = {
+    "tl_res", "tr_res", "br_res", "bl_res",
+    "res_u"}
+BOOL_KEYS = {"frame"}
+
+MESH_KEYS = {
+    "lbx", "lby", "ubx", "uby",
+    "tl", "tr", "br", "bl",
+    "tl_res", "tr_res", "br_res", "bl_res",
+    "poly", "profile",
+    "frame", "ins_top", "ins_rgt", "ins_btm", "ins_lft"}
+CURVE_KEYS = {
+    "lbx", "lby", "ubx", "uby",
+    "tl", "tr", "br", "bl",
+    "straight_handle_type"}
+
+
+def coerce_spec(row):
+    """Converts a CSV row to a specification, skipping empty cells"""
+
+    spec = {}
+    for key, value in row.items():
+        if key is None or value is None or value == "":
+            continue
+        if key in FLOAT_KEYS:
+            spec[key] = float(value)
+        elif key in INT_KEYS:
+            spec[key] = int(value)
+        elif key in BOOL_KEYS:
+            spec[key] = value.strip().lower() in ("1", "true", "yes")
+        else:
+            spec[key] = value
+    return spec
+
+
+def read_specs(path):
+    """Yields specifications from a JSON lines or CSV file"""
+
+    with open(path, "r", encoding="utf-8", newline="") as in_file:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(in_file):
+                yield coerce_spec(row)
+        else:
+            for line in in_file:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def create_mesh_object(spec, collection):
+    """Creates a mesh object from a specification"""
+
+    data = RndRectMeshMaker.create_rect_mesh(
+        **{key: spec[key] for key in MESH_KEYS if key in spec})
+
+    bm = RndRectMeshMaker.mesh_data_to_bmesh(
+        vs=data["vs"],
+        vts=data["vts"],
+        vns=data["vns"],
+        v_indices=data["v_indices"],
+        vt_indices=data["vt_indices"],
+        vn_indices=data["vn_indices"])
+
+    mesh_data = bpy.data.meshes.new(spec.get("name", "Rectangle"))
+    bm.to_mesh(mesh_data)
+    bm.free()
+    mesh_obj = bpy.data.objects.new(mesh_data.name, mesh_data)
+
+    extrude = spec.get("extrude", 0.0)
+    if extrude > 0.0:
+        ext_mod = mesh_obj.modifiers.new("Solidify", "SOLIDIFY")
+        ext_mod.thickness = extrude
+        ext_mod.offset = spec.get("offset", 0.0)
+        ext_mod.show_in_editmode = False
+
+    collection.objects.link(mesh_obj)
+    return mesh_obj, len(data["vs"])
+
+
+def create_curve_object(spec, collection):
+    """Creates a curve object from a specification"""
+
+    data = RndRectCurveMaker.create_rect_curve(
+        **{key: spec[key] for key in CURVE_KEYS if key in spec})
+
+    crv_data = bpy.data.curves.new(spec.get("name", "Rectangle"), "CURVE")
+    crv_data.dimensions = "2D"
+    crv_data.fill_mode = spec.get("fill_mode", "BOTH")
+    crv_data.extrude = spec.get("extrude", 0.0)
+    crv_data.offset = spec.get("offset", 0.0)
+
+    spline = RndRectCurveMaker.curve_data_to_spline(
+        crv_data=crv_data,
+        cos=data["cos"],
+        fhs=data["fhs"],
+        rhs=data["rhs"],
+        fh_types=data["fh_types"],
+        rh_types=data["rh_types"],
+        arcs=data["arcs"],
+        res_u=spec.get("res_u", 12),
+        spline_type=spec.get("spline_type", "BEZIER"))
+
+    crv_obj = bpy.data.objects.new(crv_data.name, crv_data)
+    collection.objects.link(crv_obj)
+
+    if spline.type == "POLY":
+        return crv_obj, len(spline.points)
+    return crv_obj, len(spline.bezier_points)
+
+
+def main(argv=None):
+    if argv is None:
+        # Blender's own arguments precede "--".
+        argv = sys.argv[sys.argv.index("--") + 1:] \
+            if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(
+        prog="blender -b -P rounded_rect_batch.py --",
+        description="Creates rounded rectangles and saves a .blend file.")
+    parser.add_argument(
+        "input",
+        help="JSON lines or CSV file of rectangle specifications")
+    parser.add_argument(
+        "output",
+        help=".blend file to save")
+    parser.add_argument(
+        "--type",
+        choices=("MESH", "CURVE"),
+        default="MESH",
+        help="Object type for specifications without a type")
+    parser.add_argument(
+        "--collection",
+        default="Rectangles",
+        help="Collection to link new objects to")
+    args = parser.parse_args(argv)
+
+    scene = bpy.context.scene
+    collection = bpy.data.collections.new(args.collection)
+    scene.collection.children.link(collection)
+
+    start = time.perf_counter()
+    mesh_count = 0
+    curve_count = 0
+    point_count = 0
+    for spec in read_specs(args.input):
+        if spec.get("type", args.type).upper() == "CURVE":
+            obj, points = create_curve_object(spec, collection)
+            curve_count = curve_count + 1
+        else:
+            obj, points = create_mesh_object(spec, collection)
+            mesh_count = mesh_count + 1
+        obj.location = (
+            spec.get("x", 0.0),
+            spec.get("y", 0.0),
+            spec.get("z", 0.0))
+        point_count = point_count + points
+    gen_elapsed = time.perf_counter() - start
+
+    bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.output))
+    elapsed = time.perf_counter() - start
+
+    count = mesh_count + curve_count
+    print("Rectangles: %d (%d meshes, %d curves)" % (
+        count, mesh_count, curve_count))
+    print("Vertices and knots: %d" % point_count)
+    print("Generation: %.3f s, %.1f rectangles/s" % (
+        gen_elapsed, count / gen_elapsed if gen_elapsed > 0.0 else 0.0))
+    print("Total with save: %.3f s" % elapsed)
+
+
+if __name__ == "__main__":
+    main()
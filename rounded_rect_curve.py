@@ -1,5 +1,7 @@
 import bpy # type: ignore
+import math
 from bpy.props import ( # type: ignore
+    BoolProperty,
     EnumProperty,
     FloatProperty,
     FloatVectorProperty,
@@ -100,9 +102,221 @@ class RndRectCurveMaker(bpy.types.Operator):
         subtype="FACTOR",
         default=0.0) # type: ignore
 
+    spline_type: EnumProperty(
+        items=[
+            ("BEZIER", "Bezier", "Bezier", 1),
+            ("POLY", "Poly", "Poly", 2)],
+        name="Spline Type",
+        default="BEZIER",
+        description="Spline type to use") # type: ignore
+
+    as_mesh: BoolProperty(
+        name="Mesh",
+        description="Create a filled mesh from the curve knots",
+        default=False) # type: ignore
+
     def execute(self, context):
-        # TODO: How to support adding to an existing curve
-        # while in edit mode?
+        # In edit mode, append a spline to the edited curve.
+        edit_obj = None
+        if context.mode == "EDIT_CURVE":
+            edit_obj = context.edit_object
+
+        if self.as_mesh and edit_obj is None:
+            data = RndRectCurveMaker.create_fill_mesh(
+                lbx=self.tl[0], lby=self.br[1],
+                ubx=self.br[0], uby=self.tl[1],
+                tl=self.rounding[0], tr=self.rounding[1],
+                br=self.rounding[2], bl=self.rounding[3],
+                res_u=self.res_u,
+                poly="QUAD",
+                fill_mode=self.fill_mode,
+                extrude=self.extrude_thick)
+
+            mesh_data = bpy.data.meshes.new("Rectangle")
+            RndRectCurveMaker.mesh_data_to_mesh(
+                mesh_data=mesh_data,
+                vs=data["vs"],
+                vts=data["vts"],
+                v_indices=data["v_indices"],
+                vt_indices=data["vt_indices"],
+                edges=data["edges"])
+
+            mesh_obj = bpy.data.objects.new(mesh_data.name, mesh_data)
+            mesh_obj.location = context.scene.cursor.location
+            context.collection.objects.link(mesh_obj)
+            return {"FINISHED"}
+
+        data = RndRectCurveMaker.create_rect_curve(
+            lbx=self.tl[0], lby=self.br[1],
+            ubx=self.br[0], uby=self.tl[1],
+            tl=self.rounding[0], tr=self.rounding[1],
+            br=self.rounding[2], bl=self.rounding[3],
+            straight_handle_type=self.straight_edge)
+
+        if edit_obj is not None:
+            # Place at the cursor, in the object's local space.
+            cursor = edit_obj.matrix_world.inverted() \
+                @ context.scene.cursor.location
+            datas = [data]
+            RndRectCurveMaker.translate_curve_data(
+                datas, cursor[0], cursor[1], cursor[2])
+
+            # Edit mode keeps its own copy of the splines, so switch
+            # out of it while appending.
+            bpy.ops.object.mode_set(mode="OBJECT")
+            RndRectCurveMaker.append_splines(
+                crv_data=edit_obj.data,
+                datas=datas,
+                res_u=self.res_u,
+                spline_type=self.spline_type)
+            bpy.ops.object.mode_set(mode="EDIT")
+            return {"FINISHED"}
+
+        crv_data = bpy.data.curves.new("Rectangle", "CURVE")
+        crv_data.dimensions = "2D"
+        crv_data.fill_mode = self.fill_mode
+        crv_data.extrude = self.extrude_thick
+        crv_data.offset = self.extrude_off
+
+        RndRectCurveMaker.curve_data_to_spline(
+            crv_data=crv_data,
+            cos=data["cos"],
+            fhs=data["fhs"],
+            rhs=data["rhs"],
+            fh_types=data["fh_types"],
+            rh_types=data["rh_types"],
+            arcs=data["arcs"],
+            res_u=self.res_u,
+            spline_type=self.spline_type)
+
+        crv_obj = bpy.data.objects.new(crv_data.name, crv_data)
+        crv_obj.location = context.scene.cursor.location
+        context.collection.objects.link(crv_obj)
+        return {"FINISHED"}
+
+    @staticmethod
+    def bezier_weights(res_u=12):
+
+        # Cubic Bernstein weights at a segment's inner evaluation
+        # points. They depend only on the resolution, so one table
+        # serves every corner of every rectangle.
+        res_u = max(res_u, 1)
+        to_t = 1.0 / res_u
+        weights = [(0.0, 0.0, 0.0, 0.0)] * (res_u - 1)
+        for m in range(1, res_u):
+            t = m * to_t
+            u = 1.0 - t
+            weights[m - 1] = (
+                u * u * u,
+                3.0 * u * u * t,
+                3.0 * u * t * t,
+                t * t * t)
+        return weights
+
+    @staticmethod
+    def translate_curve_data(datas, x=0.0, y=0.0, z=0.0):
+
+        # Offsets knots and handles in place.
+        for data in datas:
+            for key in ("cos", "fhs", "rhs"):
+                data[key] = [(v[0] + x, v[1] + y, v[2] + z)
+                             for v in data[key]]
+        return datas
+
+    @staticmethod
+    def append_splines(
+            crv_data,
+            datas,
+            res_u=12,
+            spline_type="BEZIER"):
+
+        # Append a spline per rectangle to one curve, so that many
+        # rectangles share an object.
+        splines = [None] * len(datas)
+        for i in range(0, len(datas)):
+            data = datas[i]
+            splines[i] = RndRectCurveMaker.curve_data_to_spline(
+                crv_data=crv_data,
+                cos=data["cos"],
+                fhs=data["fhs"],
+                rhs=data["rhs"],
+                fh_types=data["fh_types"],
+                rh_types=data["rh_types"],
+                arcs=data["arcs"],
+                res_u=res_u,
+                spline_type=spline_type)
+        return splines
+
+    @staticmethod
+    def curve_data_to_spline(
+            crv_data,
+            cos, fhs, rhs,
+            fh_types, rh_types,
+            arcs,
+            res_u=12,
+            spline_type="BEZIER"):
+
+        crv_splines = crv_data.splines
+        kn_count = len(cos)
+
+        if spline_type == "POLY":
+            # Blender subdivides every segment of a spline by the same
+            # resolution. Evaluate the corner arcs here instead, so the
+            # straight edges only contribute their end points.
+            weights = RndRectCurveMaker.bezier_weights(res_u)
+            pts = []
+            for i in range(0, kn_count):
+                co = cos[i]
+                pts.append(co)
+                if arcs[i]:
+                    j = (i + 1) % kn_count
+                    fh = fhs[i]
+                    rh = rhs[j]
+                    dest = cos[j]
+                    for b0, b1, b2, b3 in weights:
+                        pts.append((
+                            b0 * co[0] + b1 * fh[0]
+                            + b2 * rh[0] + b3 * dest[0],
+                            b0 * co[1] + b1 * fh[1]
+                            + b2 * rh[1] + b3 * dest[1],
+                            b0 * co[2] + b1 * fh[2]
+                            + b2 * rh[2] + b3 * dest[2]))
+
+            spline = crv_splines.new("POLY")
+            spline.use_cyclic_u = True
+
+            # Spline already contains one point. Poly points are
+            # homogeneous, with a weight of 1.0.
+            spline.points.add(len(pts) - 1)
+            spline.points.foreach_set(
+                "co", [c for pt in pts for c in (pt[0], pt[1], pt[2], 1.0)])
+            return spline
+
+        spline = crv_splines.new("BEZIER")
+        spline.use_cyclic_u = True
+        spline.resolution_u = res_u
+        bz_pts = spline.bezier_points
+
+        # Spline already contains one Bezier point.
+        bz_pts.add(kn_count - 1)
+        knt_index = 0
+        for knot in bz_pts:
+            knot.handle_left_type = rh_types[knt_index]
+            knot.handle_right_type = fh_types[knt_index]
+            knot.co = cos[knt_index]
+            knot.handle_left = rhs[knt_index]
+            knot.handle_right = fhs[knt_index]
+            knt_index = knt_index + 1
+
+        return spline
+
+    @staticmethod
+    def create_rect_curve(
+            lbx=-1.7777778, lby=-1.0,
+            ubx=1.7777778, uby=1.0,
+            tl=0.25, tr=0.25,
+            br=0.25, bl=0.25,
+            straight_handle_type="FREE"):
 
         # Constants.
         eps = 0.000001
@@ -110,19 +324,6 @@ class RndRectCurveMaker(bpy.types.Operator):
         o_3 = 1.0 / 3.0
         t_3 = 2.0 / 3.0
 
-        # Unpack corners.
-        lbx = self.tl[0]
-        lby = self.br[1]
-        ubx = self.br[0]
-        uby = self.tl[1]
-
-        # Unpack rounding factor.
-        tl = self.rounding[0]
-        tr = self.rounding[1]
-        br = self.rounding[2]
-        bl = self.rounding[3]
-
-        straight_handle_type = self.straight_edge
         corner_handle_type = "FREE"
         if straight_handle_type == "ALIGNED":
             corner_handle_type = "ALIGNED"
@@ -206,11 +407,15 @@ class RndRectCurveMaker(bpy.types.Operator):
         fh_types = [corner_handle_type] * kn_count
         rh_types = [corner_handle_type] * kn_count
 
+        # Whether the segment from a knot to the next is a corner arc.
+        arcs = [False] * kn_count
+
         # Might not be worth suporting this, because parity would be
         # difficult in the mesh version anyway...
         cursor = 0
         if tl_is_round:
             cos[cursor] = (lft_ins_0, top, 0.0)
+            arcs[cursor] = True
             fhs[cursor] = (lft_ins_0 - vtlk, top, 0.0)
             rhs[cursor] = (t_3 * lft_ins_0 + o_3 * rgt_ins_0, top, 0.0)
             rh_types[cursor] = straight_handle_type
@@ -235,6 +440,7 @@ class RndRectCurveMaker(bpy.types.Operator):
 
         if bl_is_round:
             cos[cursor] = (lft, btm_ins_1, 0.0)
+            arcs[cursor] = True
             fhs[cursor] = (lft, btm_ins_1 - vblk, 0.0)
             rhs[cursor] = (lft, t_3 * btm_ins_1 + o_3 * top_ins_1, 0.0)
             rh_types[cursor] = straight_handle_type
@@ -259,6 +465,7 @@ class RndRectCurveMaker(bpy.types.Operator):
 
         if br_is_round:
             cos[cursor] = (rgt_ins_1, btm, 0.0)
+            arcs[cursor] = True
             fhs[cursor] = (rgt_ins_1 + vbrk, btm, 0.0)
             rhs[cursor] = (t_3 * rgt_ins_1 + o_3 * lft_ins_1, btm, 0.0)
             rh_types[cursor] = straight_handle_type
@@ -283,6 +490,7 @@ class RndRectCurveMaker(bpy.types.Operator):
 
         if tr_is_round:
             cos[cursor] = (rgt, top_ins_0, 0.0)
+            arcs[cursor] = True
             fhs[cursor] = (rgt, top_ins_0 + vtrk, 0.0)
             rhs[cursor] = (rgt, t_3 * top_ins_0 + o_3 * btm_ins_0, 0.0)
             rh_types[cursor] = straight_handle_type
@@ -304,33 +512,229 @@ class RndRectCurveMaker(bpy.types.Operator):
                 fh_types[cursor] = straight_handle_type
                 rh_types[cursor] = straight_handle_type
             cursor = cursor + 1
-
-        crv_data = bpy.data.curves.new("Rectangle", "CURVE")
-        crv_data.dimensions = "2D"
-        crv_data.fill_mode = self.fill_mode
-        crv_data.extrude = self.extrude_thick
-        crv_data.offset = self.extrude_off
-        crv_splines = crv_data.splines
-        spline = crv_splines.new("BEZIER")
-        spline.use_cyclic_u = True
-        spline.resolution_u = self.res_u
-        bz_pts = spline.bezier_points
-
-        # Spline already contains one Bezier point.
-        bz_pts.add(kn_count - 1)
+        # Return a dictionary containing data.
+        return {"cos": cos,
+                "fhs": fhs,
+                "rhs": rhs,
+                "fh_types": fh_types,
+                "rh_types": rh_types,
+                "arcs": arcs,
+                "bounds": (lft, btm, rgt, top)}
+
+    @staticmethod
+    def create_fill_mesh(
+            lbx=-1.7777778, lby=-1.0,
+            ubx=1.7777778, uby=1.0,
+            tl=0.25, tr=0.25,
+            br=0.25, bl=0.25,
+            res_u=12,
+            poly="QUAD",
+            fill_mode="BOTH",
+            extrude=0.0):
+
+        # Evaluates the curve's Bezier knots directly rather than
+        # converting the curve object, then fills the outline with
+        # the same topology as the mesh add-on: an ngon, or a center
+        # quad with four edge quads and a triangle fan per corner.
+        data = RndRectCurveMaker.create_rect_curve(
+            lbx=lbx, lby=lby,
+            ubx=ubx, uby=uby,
+            tl=tl, tr=tr,
+            br=br, bl=bl)
+        cos = data["cos"]
+        fhs = data["fhs"]
+        rhs = data["rhs"]
+        arcs = data["arcs"]
+        lft, btm, rgt, top = data["bounds"]
+
+        # Unrounded corners are inset by 25 percent of half the
+        # short edge to give the fan and edge faces some width.
+        w = rgt - lft
+        h = top - btm
+        s = 0.125 * min(w, h)
+
+        # Corner point, then direction to the start and end of the
+        # corner: top-left, bottom-left, bottom-right, top-right.
+        crnrs = [
+            ((lft, top), (1.0, 0.0), (0.0, -1.0)),
+            ((lft, btm), (0.0, 1.0), (1.0, 0.0)),
+            ((rgt, btm), (-1.0, 0.0), (0.0, 1.0)),
+            ((rgt, top), (0.0, -1.0), (-1.0, 0.0))]
+
+        # Outline of the cap. Every corner shares the Bezier weights.
+        weights = RndRectCurveMaker.bezier_weights(res_u)
+        ring = []
+        crnr_strs = [0] * 4
+        crnr_ends = [0] * 4
+        inners = [(0.0, 0.0)] * 4
         knt_index = 0
-        for knot in bz_pts:
-            knot.handle_left_type = rh_types[knt_index]
-            knot.handle_right_type = fh_types[knt_index]
-            knot.co = cos[knt_index]
-            knot.handle_left = rhs[knt_index]
-            knot.handle_right = fhs[knt_index]
-            knt_index = knt_index + 1
-
-        crv_obj = bpy.data.objects.new(crv_data.name, crv_data)
-        crv_obj.location = context.scene.cursor.location
-        context.collection.objects.link(crv_obj)
-        return {"FINISHED"}
+        for c in range(0, 4):
+            pt, d_str, d_end = crnrs[c]
+            crnr_strs[c] = len(ring)
+            if arcs[knt_index]:
+                co = cos[knt_index]
+                fh = fhs[knt_index]
+                rh = rhs[knt_index + 1]
+                dest = cos[knt_index + 1]
+                ring.append((co[0], co[1]))
+                for b0, b1, b2, b3 in weights:
+                    ring.append((
+                        b0 * co[0] + b1 * fh[0] + b2 * rh[0] + b3 * dest[0],
+                        b0 * co[1] + b1 * fh[1] + b2 * rh[1] + b3 * dest[1]))
+                ring.append((dest[0], dest[1]))
+                knt_index = knt_index + 2
+            else:
+                ring.append((pt[0] + s * d_str[0], pt[1] + s * d_str[1]))
+                ring.append(pt)
+                ring.append((pt[0] + s * d_end[0], pt[1] + s * d_end[1]))
+                knt_index = knt_index + 1
+            crnr_ends[c] = len(ring) - 1
+            str_co = ring[crnr_strs[c]]
+            end_co = ring[crnr_ends[c]]
+            inners[c] = (str_co[0] + end_co[0] - pt[0],
+                         str_co[1] + end_co[1] - pt[1])
+
+        len_ring = len(ring)
+
+        # Fill faces, indexed from the start of a cap.
+        fill_indices = []
+        if poly == "NGON":
+            fill_indices.append(tuple(range(0, len_ring)))
+        else:
+            # Inner corners follow the outline.
+            ins = [len_ring, len_ring + 1, len_ring + 2, len_ring + 3]
+            ring.extend(inners)
+
+            # Center and edge quads.
+            quads = [(ins[0], ins[1], ins[2], ins[3])]
+            for c in range(0, 4):
+                d = (c + 1) % 4
+                quads.append((crnr_ends[c], crnr_strs[d], ins[d], ins[c]))
+
+            if poly == "QUAD":
+                fill_indices.extend(quads)
+            else:
+                for quad in quads:
+                    fill_indices.append((quad[0], quad[1], quad[2]))
+                    fill_indices.append((quad[0], quad[2], quad[3]))
+
+            # Corner fans.
+            for c in range(0, 4):
+                for b in range(crnr_strs[c], crnr_ends[c]):
+                    fill_indices.append((ins[c], b, b + 1))
+
+        len_cap = len(ring)
+
+        # Texture coordinates stretch over the bounds.
+        w_inv = 1.0 / w
+        h_inv = 1.0 / h
+        cap_vts = [((x - lft) * w_inv, (y - btm) * h_inv) for x, y in ring]
+
+        # Extruded curves have a front cap at +extrude, a back cap
+        # at -extrude and walls in between.
+        has_walls = extrude > 0.0
+        has_front = fill_mode in ("FRONT", "BOTH")
+        has_back = fill_mode in ("BACK", "BOTH") \
+            and (has_walls or not has_front)
+        z_front = extrude
+        z_back = -extrude if has_walls else 0.0
+
+        vs = [(x, y, z_front) for x, y in ring]
+        vts = list(cap_vts)
+        v_indices = []
+        vt_indices = []
+
+        if has_front:
+            for loop in fill_indices:
+                v_indices.append(loop)
+                vt_indices.append(loop)
+
+        back_off = 0
+        if has_walls:
+            back_off = len_cap
+            vs.extend((x, y, z_back) for x, y in ring)
+            vts.extend(cap_vts)
+
+        if has_back:
+            for loop in fill_indices:
+                rev = tuple(back_off + j for j in reversed(loop))
+                v_indices.append(rev)
+                vt_indices.append(tuple(j - back_off for j in rev))
+
+        if has_walls:
+            # Wall texture coordinates run along the outline length.
+            perim = [0.0] * (len_ring + 1)
+            for i in range(0, len_ring):
+                a = ring[i]
+                b = ring[(i + 1) % len_ring]
+                perim[i + 1] = perim[i] + math.hypot(b[0] - a[0], b[1] - a[1])
+            perim_inv = 1.0 / perim[len_ring]
+
+            vt_off = len(vts)
+            for i in range(0, len_ring + 1):
+                u = perim[i] * perim_inv
+                vts.append((u, 0.0))
+                vts.append((u, 1.0))
+
+            for i in range(0, len_ring):
+                j = (i + 1) % len_ring
+                v_indices.append((back_off + i, back_off + j, j, i))
+                vt_str = vt_off + i * 2
+                vt_indices.append((vt_str, vt_str + 2, vt_str + 3, vt_str + 1))
+
+        # Unfilled flat curves convert to their outline's edges.
+        edges = []
+        if not v_indices:
+            vs = vs[0:len_ring]
+            vts = vts[0:len_ring]
+            edges = [(i, (i + 1) % len_ring) for i in range(0, len_ring)]
+
+        # Return a dictionary containing data.
+        return {"vs": vs,
+                "vts": vts,
+                "v_indices": v_indices,
+                "vt_indices": vt_indices,
+                "edges": edges}
+
+    @staticmethod
+    def mesh_data_to_mesh(
+            mesh_data,
+            vs, vts,
+            v_indices, vt_indices,
+            edges=None):
+
+        # Write vertices, loops, faces and texture coordinates in bulk.
+        # Edges are only needed for loose outlines; faces' edges are
+        # derived on update.
+        len_vs = len(vs)
+        len_faces = len(v_indices)
+        loop_starts = [0] * len_faces
+        len_loops = 0
+        for i in range(0, len_faces):
+            loop_starts[i] = len_loops
+            len_loops = len_loops + len(v_indices[i])
+
+        mesh_data.vertices.add(len_vs)
+        mesh_data.loops.add(len_loops)
+        mesh_data.polygons.add(len_faces)
+
+        mesh_data.vertices.foreach_set(
+            "co", [c for v in vs for c in v])
+        mesh_data.loops.foreach_set(
+            "vertex_index", [j for loop in v_indices for j in loop])
+        mesh_data.polygons.foreach_set("loop_start", loop_starts)
+
+        if edges:
+            mesh_data.edges.add(len(edges))
+            mesh_data.edges.foreach_set(
+                "vertices", [j for edge in edges for j in edge])
+
+        uv_layer = mesh_data.uv_layers.new(name="UVMap")
+        uv_layer.data.foreach_set(
+            "uv", [c for loop in vt_indices for j in loop for c in vts[j]])
+
+        mesh_data.update()
+        return mesh_data
 
 
 def menu_func(self, context):
@@ -1,7 +1,10 @@
 import bpy # type: ignore
+import functools
 import math
+from array import array
 import bmesh # type: ignore
 from bpy.props import ( # type: ignore
+    BoolProperty,
     EnumProperty,
     FloatProperty,
     FloatVectorProperty,
@@ -101,12 +104,79 @@ class RndRectMeshMaker(bpy.types.Operator):
         default="CONTAIN",
         description="UV Profile to use") # type: ignore
 
+    use_frame: BoolProperty(
+        name="Frame",
+        description="Create a hollow frame between the outline and an inset",
+        default=False) # type: ignore
+
+    frame_inset: FloatVectorProperty(
+        name="Inset",
+        description="Frame inset for the top, right, bottom and left sides",
+        default=(0.1, 0.1, 0.1, 0.1),
+        min=0.0,
+        soft_max=1.0,
+        step=1,
+        precision=3,
+        size=4) # type: ignore
+
+    use_nodes: BoolProperty(
+        name="Geometry Nodes",
+        description="Generate the mesh with a shared geometry node group",
+        default=False) # type: ignore
+
     def execute(self, context):
         tl_res = self.sectors[0]
         tr_res = self.sectors[1]
         br_res = self.sectors[2]
         bl_res = self.sectors[3]
 
+        # In edit mode, append to the edited mesh.
+        edit_obj = None
+        if context.mode == "EDIT_MESH":
+            edit_obj = context.edit_object
+
+        # The node group has no frame, so frames are baked instead.
+        use_nodes = self.use_nodes and edit_obj is None
+        if use_nodes and self.use_frame:
+            self.report(
+                {"INFO"},
+                "Frames are not supported by geometry nodes; baking mesh.")
+            use_nodes = False
+
+        if use_nodes:
+            mesh_data = bpy.data.meshes.new("Rectangle")
+            mesh_obj = bpy.data.objects.new(mesh_data.name, mesh_data)
+            mesh_obj.location = context.scene.cursor.location
+
+            node_group = RndRectMeshMaker.get_rect_node_group()
+            node_mod = mesh_obj.modifiers.new("Rectangle", "NODES")
+            node_mod.node_group = node_group
+            RndRectMeshMaker.set_node_group_inputs(
+                node_mod,
+                {"Top Left": (self.tl[0], self.tl[1], 0.0),
+                 "Bottom Right": (self.br[0], self.br[1], 0.0),
+                 "Top Left Corner": self.rounding[0],
+                 "Top Right Corner": self.rounding[1],
+                 "Bottom Right Corner": self.rounding[2],
+                 "Bottom Left Corner": self.rounding[3],
+                 "Top Left Resolution": tl_res,
+                 "Top Right Resolution": tr_res,
+                 "Bottom Right Resolution": br_res,
+                 "Bottom Left Resolution": bl_res,
+                 "Polygon Type": RndRectMeshMaker.poly_type_index(
+                     self.poly_type),
+                 "UV Profile": RndRectMeshMaker.uv_profile_index(
+                     self.uv_profile)})
+
+            if self.extrude_thick > 0.0:
+                ext_mod = mesh_obj.modifiers.new("Solidify", "SOLIDIFY")
+                ext_mod.thickness = self.extrude_thick
+                ext_mod.offset = self.extrude_off
+                ext_mod.show_in_editmode = False
+
+            context.collection.objects.link(mesh_obj)
+            return {"FINISHED"}
+
         data = RndRectMeshMaker.create_rect_mesh(
             lbx=self.tl[0], lby=self.br[1],
             ubx=self.br[0], uby=self.tl[1],
@@ -115,7 +185,29 @@ class RndRectMeshMaker(bpy.types.Operator):
             tl_res=tl_res, tr_res=tr_res,
             br_res=br_res, bl_res=bl_res,
             poly=self.poly_type,
-            profile=self.uv_profile)
+            profile=self.uv_profile,
+            frame=self.use_frame,
+            ins_top=self.frame_inset[0], ins_rgt=self.frame_inset[1],
+            ins_btm=self.frame_inset[2], ins_lft=self.frame_inset[3])
+
+        if edit_obj is not None:
+            # Place at the cursor, in the object's local space.
+            cursor = edit_obj.matrix_world.inverted() \
+                @ context.scene.cursor.location
+            vs = [(v[0] + cursor[0], v[1] + cursor[1], v[2] + cursor[2])
+                  for v in data["vs"]]
+
+            edit_bm = bmesh.from_edit_mesh(edit_obj.data)
+            RndRectMeshMaker.mesh_data_to_bmesh(
+                vs=vs,
+                vts=data["vts"],
+                vns=data["vns"],
+                v_indices=data["v_indices"],
+                vt_indices=data["vt_indices"],
+                vn_indices=data["vn_indices"],
+                bm=edit_bm)
+            bmesh.update_edit_mesh(edit_obj.data)
+            return {"FINISHED"}
 
         bm = RndRectMeshMaker.mesh_data_to_bmesh(
             vs=data["vs"],
@@ -145,12 +237,312 @@ class RndRectMeshMaker(bpy.types.Operator):
     def poll(cls, context):
         return context.area.type == "VIEW_3D"
 
+    @staticmethod
+    def poly_type_index(poly="QUAD"):
+        return {"NGON": 0, "QUAD": 1, "TRI": 2}.get(poly, 1)
+
+    @staticmethod
+    def uv_profile_index(profile="STRETCH"):
+        return {"CONTAIN": 0, "COVER": 1, "STRETCH": 2}.get(profile, 2)
+
+    @staticmethod
+    def set_node_group_inputs(node_mod, values):
+
+        # Modifier inputs are keyed by socket identifier, not name.
+        node_group = node_mod.node_group
+        for item in node_group.interface.items_tree:
+            if item.item_type == "SOCKET" \
+                    and item.in_out == "INPUT" \
+                    and item.name in values:
+                node_mod[item.identifier] = values[item.name]
+
+    @staticmethod
+    def node_math(node_group, operation, a, b=0.0, c=0.0):
+
+        # Inputs may be either sockets to link or constants.
+        node = node_group.nodes.new("ShaderNodeMath")
+        node.operation = operation
+        operands = (a, b, c)
+        for i in range(0, 3):
+            operand = operands[i]
+            if isinstance(operand, float):
+                node.inputs[i].default_value = operand
+            else:
+                node_group.links.new(operand, node.inputs[i])
+        return node.outputs[0]
+
+    @staticmethod
+    def node_switch(node_group, input_type, switch, false, true):
+
+        # Branches may be either sockets to link or constants.
+        node = node_group.nodes.new("GeometryNodeSwitch")
+        node.input_type = input_type
+        node_group.links.new(switch, node.inputs["Switch"])
+        for name, branch in (("False", false), ("True", true)):
+            if isinstance(branch, float):
+                node.inputs[name].default_value = branch
+            else:
+                node_group.links.new(branch, node.inputs[name])
+        return node.outputs[0]
+
+    @staticmethod
+    def node_layout(node_group, x_step=200.0, y_step=-180.0):
+
+        # Place nodes in columns by their longest link path from a
+        # source node, so the shared tree stays readable when edited.
+        depths = {node.name: 0 for node in node_group.nodes}
+        changed = True
+        while changed:
+            changed = False
+            for link in node_group.links:
+                depth = depths[link.from_node.name] + 1
+                if depth > depths[link.to_node.name]:
+                    depths[link.to_node.name] = depth
+                    changed = True
+
+        rows = {}
+        for node in node_group.nodes:
+            col = depths[node.name]
+            row = rows.get(col, 0)
+            node.location = (col * x_step, row * y_step)
+            rows[col] = row + 1
+
+    @staticmethod
+    def node_index_switch(node_group, data_type, index, items):
+
+        node = node_group.nodes.new("GeometryNodeIndexSwitch")
+        node.data_type = data_type
+        while len(node.index_switch_items) < len(items):
+            node.index_switch_items.new()
+        node_group.links.new(index, node.inputs["Index"])
+        for i in range(0, len(items)):
+            node_group.links.new(items[i], node.inputs[i + 1])
+        return node.outputs[0]
+
+    @staticmethod
+    def get_rect_node_group(name="Rounded Rectangle"):
+
+        # Reuse the group so that all rectangles share one node tree.
+        node_group = bpy.data.node_groups.get(name)
+        if node_group is not None \
+                and node_group.bl_idname == "GeometryNodeTree":
+            return node_group
+
+        node_group = bpy.data.node_groups.new(name, "GeometryNodeTree")
+        node_group.is_modifier = True
+        interface = node_group.interface
+        nodes = node_group.nodes
+        links = node_group.links
+        math_node = RndRectMeshMaker.node_math
+        switch_node = RndRectMeshMaker.node_switch
+        index_switch = RndRectMeshMaker.node_index_switch
+
+        interface.new_socket(
+            name="Geometry",
+            in_out="OUTPUT",
+            socket_type="NodeSocketGeometry")
+
+        sock = interface.new_socket(
+            name="Top Left",
+            in_out="INPUT",
+            socket_type="NodeSocketVector")
+        sock.default_value = (-1.7777778, 1.0, 0.0)
+
+        sock = interface.new_socket(
+            name="Bottom Right",
+            in_out="INPUT",
+            socket_type="NodeSocketVector")
+        sock.default_value = (1.7777778, -1.0, 0.0)
+
+        # Corner order matches the operator: tl, tr, br, bl.
+        crnr_names = ["Top Left", "Top Right", "Bottom Right", "Bottom Left"]
+        for crnr_name in crnr_names:
+            sock = interface.new_socket(
+                name=crnr_name + " Corner",
+                in_out="INPUT",
+                socket_type="NodeSocketFloat")
+            sock.default_value = 0.25
+            sock.min_value = 0.0
+            sock.max_value = 0.999
+
+        for crnr_name in crnr_names:
+            sock = interface.new_socket(
+                name=crnr_name + " Resolution",
+                in_out="INPUT",
+                socket_type="NodeSocketInt")
+            sock.default_value = 8
+            sock.min_value = 0
+
+        sock = interface.new_socket(
+            name="Polygon Type",
+            in_out="INPUT",
+            socket_type="NodeSocketInt")
+        sock.description = "0: Ngon, 1: Quadrilateral, 2: Triangle"
+        sock.default_value = 1
+        sock.min_value = 0
+        sock.max_value = 2
+
+        sock = interface.new_socket(
+            name="UV Profile",
+            in_out="INPUT",
+            socket_type="NodeSocketInt")
+        sock.description = "0: Contain, 1: Cover, 2: Stretch"
+        sock.default_value = 0
+        sock.min_value = 0
+        sock.max_value = 2
+
+        group_in = nodes.new("NodeGroupInput")
+        group_out = nodes.new("NodeGroupOutput")
+
+        # Validate corners.
+        tl_xyz = nodes.new("ShaderNodeSeparateXYZ")
+        br_xyz = nodes.new("ShaderNodeSeparateXYZ")
+        links.new(group_in.outputs["Top Left"], tl_xyz.inputs[0])
+        links.new(group_in.outputs["Bottom Right"], br_xyz.inputs[0])
+        cx = math_node(node_group, "MULTIPLY",
+                       math_node(node_group, "ADD", tl_xyz.outputs[0],
+                                 br_xyz.outputs[0]), 0.5)
+        cy = math_node(node_group, "MULTIPLY",
+                       math_node(node_group, "ADD", tl_xyz.outputs[1],
+                                 br_xyz.outputs[1]), 0.5)
+        wh = math_node(node_group, "MULTIPLY",
+                       math_node(node_group, "ABSOLUTE",
+                                 math_node(node_group, "SUBTRACT",
+                                           br_xyz.outputs[0],
+                                           tl_xyz.outputs[0])), 0.5)
+        hh = math_node(node_group, "MULTIPLY",
+                       math_node(node_group, "ABSOLUTE",
+                                 math_node(node_group, "SUBTRACT",
+                                           tl_xyz.outputs[1],
+                                           br_xyz.outputs[1])), 0.5)
+
+        # Protect from zero dimension meshes, as create_rect_mesh does:
+        # a zero width or height becomes a square, both become 16:9.
+        w_inval = math_node(node_group, "LESS_THAN", wh, 0.0000005)
+        h_inval = math_node(node_group, "LESS_THAN", hh, 0.0000005)
+        v_wh = switch_node(
+            node_group, "FLOAT", w_inval, wh,
+            switch_node(node_group, "FLOAT", h_inval, hh, 1.7777778))
+        v_hh = switch_node(
+            node_group, "FLOAT", h_inval, hh,
+            switch_node(node_group, "FLOAT", w_inval, wh, 1.0))
+
+        lft = math_node(node_group, "SUBTRACT", cx, v_wh)
+        rgt = math_node(node_group, "ADD", cx, v_wh)
+        btm = math_node(node_group, "SUBTRACT", cy, v_hh)
+        top = math_node(node_group, "ADD", cy, v_hh)
+        w = math_node(node_group, "MULTIPLY", v_wh, 2.0)
+        h = math_node(node_group, "MULTIPLY", v_hh, 2.0)
+        short_edge = math_node(node_group, "MINIMUM", w, h)
+        long_edge = math_node(node_group, "MAXIMUM", w, h)
+
+        # Half the short edge is the maximum corner size.
+        se = math_node(node_group, "MULTIPLY", short_edge, 0.5)
+        radii = [None] * 4
+        for i in range(0, 4):
+            fac = math_node(node_group, "MINIMUM",
+                            group_in.outputs[crnr_names[i] + " Corner"],
+                            1.0 - 0.000001)
+            radii[i] = math_node(node_group, "MULTIPLY", se, fac)
+
+        # Points are in counter-clockwise order: tl, bl, br, tr.
+        pts = [(lft, top), (lft, btm), (rgt, btm), (rgt, top)]
+        quad = nodes.new("GeometryNodeCurvePrimitiveQuadrilateral")
+        quad.mode = "POINTS"
+        for i in range(0, 4):
+            pt_xyz = nodes.new("ShaderNodeCombineXYZ")
+            links.new(pts[i][0], pt_xyz.inputs[0])
+            links.new(pts[i][1], pt_xyz.inputs[1])
+            links.new(pt_xyz.outputs[0], quad.inputs["Point %d" % (i + 1)])
+
+        # Per-corner radius and resolution by point index.
+        crnr_order = [0, 3, 2, 1]
+        index = nodes.new("GeometryNodeInputIndex").outputs[0]
+        radius = index_switch(
+            node_group, "FLOAT", index,
+            [radii[j] for j in crnr_order])
+        count = index_switch(
+            node_group, "INT", index,
+            [group_in.outputs[crnr_names[j] + " Resolution"]
+             for j in crnr_order])
+
+        fillet = nodes.new("GeometryNodeFilletCurve")
+        fillet.mode = "POLY"
+        fillet.inputs["Limit Radius"].default_value = True
+        links.new(quad.outputs[0], fillet.inputs["Curve"])
+        links.new(radius, fillet.inputs["Radius"])
+        links.new(count, fillet.inputs["Count"])
+
+        # Fill curve has no quad and fan mode, so quadrilaterals
+        # fall back to triangles.
+        fill_ngon = nodes.new("GeometryNodeFillCurve")
+        fill_ngon.mode = "NGONS"
+        fill_tri = nodes.new("GeometryNodeFillCurve")
+        fill_tri.mode = "TRIANGLES"
+        links.new(fillet.outputs[0], fill_ngon.inputs["Curve"])
+        links.new(fillet.outputs[0], fill_tri.inputs["Curve"])
+
+        is_ngon = math_node(node_group, "LESS_THAN",
+                            group_in.outputs["Polygon Type"], 0.5)
+        switch = nodes.new("GeometryNodeSwitch")
+        switch.input_type = "GEOMETRY"
+        links.new(is_ngon, switch.inputs["Switch"])
+        links.new(fill_tri.outputs[0], switch.inputs["False"])
+        links.new(fill_ngon.outputs[0], switch.inputs["True"])
+
+        # UV coordinate scalars according to profile.
+        one = math_node(node_group, "ADD", 1.0, 0.0)
+        u_scl = index_switch(
+            node_group, "FLOAT", group_in.outputs["UV Profile"],
+            [math_node(node_group, "DIVIDE", short_edge, h),
+             math_node(node_group, "DIVIDE", long_edge, h),
+             one])
+        v_scl = index_switch(
+            node_group, "FLOAT", group_in.outputs["UV Profile"],
+            [math_node(node_group, "DIVIDE", short_edge, w),
+             math_node(node_group, "DIVIDE", long_edge, w),
+             one])
+
+        # Texture coordinates from position, about the center.
+        pos_xyz = nodes.new("ShaderNodeSeparateXYZ")
+        links.new(nodes.new("GeometryNodeInputPosition").outputs[0],
+                  pos_xyz.inputs[0])
+        u = math_node(node_group, "DIVIDE",
+                      math_node(node_group, "SUBTRACT",
+                                pos_xyz.outputs[0], lft), w)
+        v = math_node(node_group, "DIVIDE",
+                      math_node(node_group, "SUBTRACT",
+                                pos_xyz.outputs[1], btm), h)
+        u = math_node(node_group, "MULTIPLY_ADD",
+                      math_node(node_group, "SUBTRACT", u, 0.5),
+                      u_scl, 0.5)
+        v = math_node(node_group, "MULTIPLY_ADD",
+                      math_node(node_group, "SUBTRACT", v, 0.5),
+                      v_scl, 0.5)
+        uv_xyz = nodes.new("ShaderNodeCombineXYZ")
+        links.new(u, uv_xyz.inputs[0])
+        links.new(v, uv_xyz.inputs[1])
+
+        store_uv = nodes.new("GeometryNodeStoreNamedAttribute")
+        store_uv.data_type = "FLOAT2"
+        store_uv.domain = "CORNER"
+        store_uv.inputs["Name"].default_value = "UVMap"
+        links.new(switch.outputs[0], store_uv.inputs["Geometry"])
+        links.new(uv_xyz.outputs[0], store_uv.inputs["Value"])
+
+        links.new(store_uv.outputs[0], group_out.inputs["Geometry"])
+        RndRectMeshMaker.node_layout(node_group)
+        return node_group
+
     @staticmethod
     def mesh_data_to_bmesh(
             vs, vts, vns,
-            v_indices, vt_indices, vn_indices):
+            v_indices, vt_indices, vn_indices,
+            bm=None):
 
-        bm = bmesh.new()
+        # Append to an existing BMesh, e.g., one in edit mode.
+        if bm is None:
+            bm = bmesh.new()
 
         # Create BM vertices.
         len_vs = len(vs)
@@ -187,6 +579,313 @@ class RndRectMeshMaker(bpy.types.Operator):
 
         return bm
 
+    @staticmethod
+    def append_mesh_data(
+            mesh_data,
+            vs, vts,
+            v_indices, vt_indices):
+
+        # Append vertices, loops, faces and texture coordinates to an
+        # object mode mesh in bulk. Rectangles merged by
+        # create_rect_batch are appended in a single call.
+        old_len_vs = len(mesh_data.vertices)
+        old_len_loops = len(mesh_data.loops)
+        old_len_faces = len(mesh_data.polygons)
+
+        # Existing data is read back, as foreach_set writes the whole
+        # collection.
+        cos = [0.0] * (old_len_vs * 3)
+        mesh_data.vertices.foreach_get("co", cos)
+        loop_vs = [0] * old_len_loops
+        mesh_data.loops.foreach_get("vertex_index", loop_vs)
+        loop_starts = [0] * old_len_faces
+        mesh_data.polygons.foreach_get("loop_start", loop_starts)
+
+        uv_layer = mesh_data.uv_layers.active
+        if uv_layer is None:
+            uv_layer = mesh_data.uv_layers.new(name="UVMap")
+        uvs = [0.0] * (old_len_loops * 2)
+        uv_layer.data.foreach_get("uv", uvs)
+
+        cos.extend(c for v in vs for c in v)
+        len_loops = old_len_loops
+        for v_loop in v_indices:
+            loop_starts.append(len_loops)
+            len_loops = len_loops + len(v_loop)
+            loop_vs.extend(j + old_len_vs for j in v_loop)
+        uvs.extend(c for vt_loop in vt_indices
+                   for j in vt_loop for c in vts[j])
+
+        mesh_data.vertices.add(len(vs))
+        mesh_data.loops.add(len_loops - old_len_loops)
+        mesh_data.polygons.add(len(v_indices))
+
+        mesh_data.vertices.foreach_set("co", cos)
+        mesh_data.loops.foreach_set("vertex_index", loop_vs)
+        mesh_data.polygons.foreach_set("loop_start", loop_starts)
+        uv_layer.data.foreach_set("uv", uvs)
+
+        # Edges are only derived automatically for meshes without any,
+        # so recalculate them for the appended faces.
+        mesh_data.update(calc_edges=True)
+        return mesh_data
+
+    @staticmethod
+    def bake_shape_keys(
+            mesh_obj, states,
+            tl_res=16, tr_res=16,
+            br_res=16, bl_res=16,
+            poly="QUAD",
+            profile="STRETCH"):
+
+        # Each state is a dictionary of keyword arguments for
+        # create_rect_mesh, e.g., lbx, lby, ubx, uby, tl, tr, br, bl,
+        # plus an optional name. Resolution, polygon type and profile
+        # are shared so that every state has the same topology.
+        mesh_data = mesh_obj.data
+        len_vs = len(mesh_data.vertices)
+
+        # Read the mesh's faces as vertex index loops, to compare with
+        # each state's topology.
+        len_loops = len(mesh_data.loops)
+        len_faces = len(mesh_data.polygons)
+        loop_vs = [0] * len_loops
+        mesh_data.loops.foreach_get("vertex_index", loop_vs)
+        loop_starts = [0] * len_faces
+        mesh_data.polygons.foreach_get("loop_start", loop_starts)
+        loop_totals = [0] * len_faces
+        mesh_data.polygons.foreach_get("loop_total", loop_totals)
+        mesh_indices = [None] * len_faces
+        for i in range(0, len_faces):
+            start = loop_starts[i]
+            mesh_indices[i] = tuple(loop_vs[start:start + loop_totals[i]])
+
+        # Generate and validate every state before changing the mesh,
+        # so a mismatch leaves it untouched.
+        len_states = len(states)
+        names = [None] * len_states
+        cos = [None] * len_states
+        for i in range(0, len_states):
+            state = dict(states[i])
+            names[i] = state.pop("name", "Rectangle.%03d" % i)
+            shared = [key for key in (
+                "tl_res", "tr_res", "br_res", "bl_res", "poly", "profile")
+                if key in state]
+            if shared:
+                raise ValueError(
+                    "State %d sets %s, which are shared by all states." % (
+                        i, ", ".join(shared)))
+
+            data = RndRectMeshMaker.create_rect_mesh(
+                tl_res=tl_res, tr_res=tr_res,
+                br_res=br_res, bl_res=bl_res,
+                poly=poly,
+                profile=profile,
+                **dict(state, compact=False))
+
+            # Topology also depends on whether a corner is rounded,
+            # as unrounded corners use a single vertex.
+            vs = data["vs"]
+            v_indices = data["v_indices"]
+            if len(vs) != len_vs \
+                    or len(v_indices) != len_faces \
+                    or any(tuple(v_indices[j]) != mesh_indices[j]
+                           for j in range(0, len_faces)):
+                raise ValueError(
+                    "State %d does not match the mesh topology." % i)
+            cos[i] = [c for v in vs for c in v]
+
+        # The basis holds the mesh's current coordinates.
+        if mesh_data.shape_keys is None:
+            mesh_obj.shape_key_add(name="Basis", from_mix=False)
+
+        # Write all coordinates at once.
+        key_blocks = [None] * len_states
+        for i in range(0, len_states):
+            key_block = mesh_obj.shape_key_add(name=names[i], from_mix=False)
+            key_block.data.foreach_set("co", cos[i])
+            key_blocks[i] = key_block
+
+        mesh_data.update()
+        return key_blocks
+
+    @staticmethod
+    def pack_shelves(sizes, padding=0.0):
+
+        # Place rectangles of the given widths and heights in rows,
+        # tallest first. Returns the lower-left corner of each
+        # rectangle and the width and height of the packed area.
+        len_sizes = len(sizes)
+        offsets = [(0.0, 0.0)] * len_sizes
+        if len_sizes < 1:
+            return offsets, 0.0, 0.0
+
+        # Aim for a square atlas.
+        area = 0.0
+        max_w = 0.0
+        for size in sizes:
+            area = area + (size[0] + padding) * (size[1] + padding)
+            max_w = max(max_w, size[0] + padding)
+        shelf_limit = max(math.sqrt(area), max_w)
+
+        order = sorted(range(0, len_sizes),
+                       key=lambda i: sizes[i][1],
+                       reverse=True)
+
+        pack_w = 0.0
+        shelf_x = padding
+        shelf_y = padding
+        shelf_h = 0.0
+        for i in order:
+            w, h = sizes[i]
+            if shelf_x + w + padding > shelf_limit and shelf_x > padding:
+                shelf_y = shelf_y + shelf_h + padding
+                shelf_x = padding
+                shelf_h = 0.0
+            offsets[i] = (shelf_x, shelf_y)
+            shelf_x = shelf_x + w + padding
+            shelf_h = max(shelf_h, h)
+            pack_w = max(pack_w, shelf_x)
+
+        return offsets, pack_w, shelf_y + shelf_h + padding
+
+    @staticmethod
+    def create_rect_batch(
+            specs,
+            atlas=False,
+            padding=0.0,
+            preserve_aspect=True):
+
+        # Each spec is a dictionary of keyword arguments for
+        # create_rect_mesh. Rectangles are merged into one set of
+        # mesh data. With atlas enabled, each rectangle's UV island
+        # is packed into a shared texture.
+        len_specs = len(specs)
+        datas = [None] * len_specs
+        for i in range(0, len_specs):
+            datas[i] = RndRectMeshMaker.create_rect_mesh(
+                **dict(specs[i], compact=False))
+
+        vs = []
+        vts = []
+        v_indices = []
+        vn_indices = []
+
+        # Each rectangle's texture tile is the unit square of its UV
+        # space. Its cell in the atlas frames both the tile and the
+        # island, so the profile's island shape is kept: contained
+        # islands leave margins, covering islands overhang the tile.
+        # Preserving aspect sizes each tile so the island matches its
+        # rectangle's dimensions, so texel density is uniform across
+        # the batch. Otherwise, tiles are unit squares.
+        islands = [None] * len_specs
+        tiles = [(1.0, 1.0)] * len_specs
+        sizes = [(1.0, 1.0)] * len_specs
+        if atlas:
+            for i in range(0, len_specs):
+                data = datas[i]
+                data_vs = data["vs"]
+                data_vts = data["vts"]
+                u_min = min(vt[0] for vt in data_vts)
+                u_max = max(vt[0] for vt in data_vts)
+                v_min = min(vt[1] for vt in data_vts)
+                v_max = max(vt[1] for vt in data_vts)
+                fu_min = min(u_min, 0.0)
+                fv_min = min(v_min, 0.0)
+                fu_span = max(u_max, 1.0) - fu_min
+                fv_span = max(v_max, 1.0) - fv_min
+                islands[i] = (fu_min, fv_min)
+
+                if preserve_aspect:
+                    x_min = min(v[0] for v in data_vs)
+                    x_max = max(v[0] for v in data_vs)
+                    y_min = min(v[1] for v in data_vs)
+                    y_max = max(v[1] for v in data_vs)
+                    tiles[i] = (
+                        (x_max - x_min) / max(u_max - u_min, 0.000001),
+                        (y_max - y_min) / max(v_max - v_min, 0.000001))
+                tile_w, tile_h = tiles[i]
+                sizes[i] = (fu_span * tile_w, fv_span * tile_h)
+
+            # Tiles are in world units when preserving aspect, else in
+            # unit tiles. So that padding means the same either way, it
+            # is a fraction of the side of a square holding every cell
+            # without padding, i.e. roughly a fraction of the atlas.
+            area = 0.0
+            for size in sizes:
+                area = area + size[0] * size[1]
+            offsets, pack_w, pack_h = RndRectMeshMaker.pack_shelves(
+                sizes, padding * math.sqrt(area))
+            pack_inv = 1.0 / max(pack_w, pack_h, 0.000001)
+
+        for i in range(0, len_specs):
+            data = datas[i]
+            v_offset = len(vs)
+
+            vs.extend(data["vs"])
+
+            if atlas:
+                # Map the island's frame to its cell in the atlas.
+                u_min, v_min = islands[i]
+                tile_w, tile_h = tiles[i]
+                cell_x, cell_y = offsets[i]
+                u_scl = tile_w * pack_inv
+                v_scl = tile_h * pack_inv
+                u_off = cell_x * pack_inv
+                v_off = cell_y * pack_inv
+                vts.extend(
+                    ((vt[0] - u_min) * u_scl + u_off,
+                     (vt[1] - v_min) * v_scl + v_off)
+                    for vt in data["vts"])
+            else:
+                vts.extend(data["vts"])
+
+            v_indices.extend(
+                tuple(j + v_offset for j in loop)
+                for loop in data["v_indices"])
+            vn_indices.extend(data["vn_indices"])
+
+        # Return a dictionary containing data.
+        return {"vs": vs,
+                "vts": vts,
+                "vns": [(0.0, 0.0, 1.0)],
+                "v_indices": v_indices,
+                "vt_indices": v_indices.copy(),
+                "vn_indices": vn_indices}
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def unit_arc(res):
+
+        # Cosines and sines of a quarter arc's inner vertices, in order
+        # of increasing angle. They depend only on the resolution, so
+        # they are cached between rectangles.
+        to_theta = (math.pi * 0.5) / (res + 1.0)
+        return tuple(
+            (math.cos(j * to_theta), math.sin(j * to_theta))
+            for j in range(1, res + 1))
+
+    @staticmethod
+    def arc_offsets(radius, res, u_scl=1.0, v_scl=1.0, cache=None):
+
+        # Offsets of a quarter arc's inner vertices from its center,
+        # in order of increasing angle, as (x, y, u, v). Texture
+        # coordinate offsets are the coordinate offsets times the
+        # scalars. Other corners are mirrors of this one, so they only
+        # flip signs. Results are memoized in the cache, if given.
+        key = (radius, res)
+        if cache is not None and key in cache:
+            return cache[key]
+
+        ru = radius * u_scl
+        rv = radius * v_scl
+        offs = [(radius * c, radius * s, ru * c, rv * s)
+                for c, s in RndRectMeshMaker.unit_arc(res)]
+
+        if cache is not None:
+            cache[key] = offs
+        return offs
+
     @staticmethod
     def create_rect_mesh(
             lbx=-1.7777778, lby=-1.0,
@@ -196,11 +895,14 @@ class RndRectMeshMaker(bpy.types.Operator):
             tl_res=16, tr_res=16,
             br_res=16, bl_res=16,
             poly="QUAD",
-            profile="STRETCH"):
+            profile="STRETCH",
+            frame=False,
+            ins_top=0.1, ins_rgt=0.1,
+            ins_btm=0.1, ins_lft=0.1,
+            compact=False):
 
         # Constants.
         eps = 0.000001
-        half_pi = math.pi * 0.5
 
         # Validate corners.
         lft = min(lbx, ubx)
@@ -289,8 +991,9 @@ class RndRectMeshMaker(bpy.types.Operator):
 
         # Initialize data arrays.
         # For QUAD and TRI, add 4 in-corner points.
+        # Frames add their inner outline later.
         len_vs = 8 + v_tl_res + v_bl_res + v_br_res + v_tr_res
-        if poly != "NGON":
+        if poly != "NGON" and not frame:
             len_vs = len_vs + 4
         vs = [(0.0, 0.0, 0.0)] * len_vs
         vts = [(0.5, 0.5)] * len_vs
@@ -344,26 +1047,33 @@ class RndRectMeshMaker(bpy.types.Operator):
         vts[tr_crnr_idx_end] = (u7 - 0.5) * u_scl + 0.5, \
                                (v7 - 0.5) * v_scl + 0.5
 
-        # Find conversion from resolution to theta.
-        tl_to_theta = half_pi / (v_tl_res + 1.0)
-        bl_to_theta = half_pi / (v_bl_res + 1.0)
-        br_to_theta = half_pi / (v_br_res + 1.0)
-        tr_to_theta = half_pi / (v_tr_res + 1.0)
+        # Find arc offsets from the corner centers. Corners with equal
+        # radius and resolution share them, so a symmetric rectangle
+        # scales one corner's offsets and mirrors them to the others.
+        # The offsets' texture coordinate scalars are the same for all.
+        arc_cache = {}
+        du_scl = w_inv * u_scl
+        dv_scl = h_inv * v_scl
+        tl_offs = RndRectMeshMaker.arc_offsets(
+            vtl, v_tl_res, du_scl, dv_scl, arc_cache) if tl_is_rnd else None
+        bl_offs = RndRectMeshMaker.arc_offsets(
+            vbl, v_bl_res, du_scl, dv_scl, arc_cache) if bl_is_rnd else None
+        br_offs = RndRectMeshMaker.arc_offsets(
+            vbr, v_br_res, du_scl, dv_scl, arc_cache) if br_is_rnd else None
+        tr_offs = RndRectMeshMaker.arc_offsets(
+            vtr, v_tr_res, du_scl, dv_scl, arc_cache) if tr_is_rnd else None
 
         # Top-left arc.
         if tl_is_rnd:
-            tl_range = range(0, v_tl_res)
-            for i in tl_range:
-                # Reverse order.
-                theta = (v_tl_res - i) * tl_to_theta
-                x = lft_ins_0 - vtl * math.cos(theta)
-                y = top_ins_1 + vtl * math.sin(theta)
-                u = (x - lft) * w_inv
-                v = (y - btm) * h_inv
-                vs[tl_crnr_idx_str + 1 + i] = (x, y, 0.0)
-                vts[tl_crnr_idx_str + 1 + i] = (
-                    (u - 0.5) * u_scl + 0.5,
-                    (v - 0.5) * v_scl + 0.5)
+            # Reverse order.
+            cx, cy = lft_ins_0, top_ins_1
+            cu = ((cx - lft) * w_inv - 0.5) * u_scl + 0.5
+            cv = ((cy - btm) * h_inv - 0.5) * v_scl + 0.5
+            j = tl_crnr_idx_str + 1
+            for dx, dy, du, dv in reversed(tl_offs):
+                vs[j] = (cx - dx, cy + dy, 0.0)
+                vts[j] = (cu - du, cv + dv)
+                j = j + 1
         else:
             vs[tl_crnr_idx_str + 1] = (lft, top, 0.0)
             u, v = 0.0, 1.0
@@ -372,17 +1082,14 @@ class RndRectMeshMaker(bpy.types.Operator):
 
         # Bottom-left arc.
         if bl_is_rnd:
-            bl_range = range(0, v_bl_res)
-            for i in bl_range:
-                theta = (i + 1) * bl_to_theta
-                x = lft_ins_1 - vbl * math.cos(theta)
-                y = btm_ins_1 - vbl * math.sin(theta)
-                u = (x - lft) * w_inv
-                v = (y - btm) * h_inv
-                vs[bl_crnr_idx_str + 1 + i] = (x, y, 0.0)
-                vts[bl_crnr_idx_str + 1 + i] = (
-                    (u - 0.5) * u_scl + 0.5,
-                    (v - 0.5) * v_scl + 0.5)
+            cx, cy = lft_ins_1, btm_ins_1
+            cu = ((cx - lft) * w_inv - 0.5) * u_scl + 0.5
+            cv = ((cy - btm) * h_inv - 0.5) * v_scl + 0.5
+            j = bl_crnr_idx_str + 1
+            for dx, dy, du, dv in bl_offs:
+                vs[j] = (cx - dx, cy - dy, 0.0)
+                vts[j] = (cu - du, cv - dv)
+                j = j + 1
         else:
             vs[bl_crnr_idx_str + 1] = (lft, btm, 0.0)
             u, v = 0.0, 0.0
@@ -391,18 +1098,15 @@ class RndRectMeshMaker(bpy.types.Operator):
 
         # Bottom-right arc.
         if br_is_rnd:
-            br_range = range(0, v_br_res)
-            for i in br_range:
-                # Reverse order.
-                theta = (v_br_res - i) * br_to_theta
-                x = rgt_ins_1 + vbr * math.cos(theta)
-                y = btm_ins_0 - vbr * math.sin(theta)
-                u = (x - lft) * w_inv
-                v = (y - btm) * h_inv
-                vs[br_crnr_idx_str + 1 + i] = (x, y, 0.0)
-                vts[br_crnr_idx_str + 1 + i] = (
-                    (u - 0.5) * u_scl + 0.5,
-                    (v - 0.5) * v_scl + 0.5)
+            # Reverse order.
+            cx, cy = rgt_ins_1, btm_ins_0
+            cu = ((cx - lft) * w_inv - 0.5) * u_scl + 0.5
+            cv = ((cy - btm) * h_inv - 0.5) * v_scl + 0.5
+            j = br_crnr_idx_str + 1
+            for dx, dy, du, dv in reversed(br_offs):
+                vs[j] = (cx + dx, cy - dy, 0.0)
+                vts[j] = (cu + du, cv - dv)
+                j = j + 1
         else:
             vs[br_crnr_idx_str + 1] = (rgt, btm, 0.0)
             u, v = 1.0, 0.0
@@ -411,24 +1115,161 @@ class RndRectMeshMaker(bpy.types.Operator):
 
         # Top-right arc.
         if tr_is_rnd:
-            tr_range = range(0, v_tr_res)
-            for i in tr_range:
-                theta = (i + 1) * tr_to_theta
-                x = rgt_ins_0 + vtr * math.cos(theta)
-                y = top_ins_0 + vtr * math.sin(theta)
-                u = (x - lft) * w_inv
-                v = (y - btm) * h_inv
-                vs[tr_crnr_idx_str + 1 + i] = (x, y, 0.0)
-                vts[tr_crnr_idx_str + 1 + i] = (
-                    (u - 0.5) * u_scl + 0.5,
-                    (v - 0.5) * v_scl + 0.5)
+            cx, cy = rgt_ins_0, top_ins_0
+            cu = ((cx - lft) * w_inv - 0.5) * u_scl + 0.5
+            cv = ((cy - btm) * h_inv - 0.5) * v_scl + 0.5
+            j = tr_crnr_idx_str + 1
+            for dx, dy, du, dv in tr_offs:
+                vs[j] = (cx + dx, cy + dy, 0.0)
+                vts[j] = (cu + du, cv + dv)
+                j = j + 1
         else:
             vs[tr_crnr_idx_str + 1] = (rgt, top, 0.0)
             u, v = 1.0, 1.0
             vts[tr_crnr_idx_str + 1] = (u - 0.5) * u_scl + 0.5, \
                                        (v - 0.5) * v_scl + 0.5
 
-        if poly == "NGON":
+        if frame:
+            # Validate insets. The inner rectangle cannot be inverted.
+            ins_t = max(ins_top, 0.0)
+            ins_r = max(ins_rgt, 0.0)
+            ins_b = max(ins_btm, 0.0)
+            ins_l = max(ins_lft, 0.0)
+            ins_w = ins_l + ins_r
+            ins_h = ins_t + ins_b
+            if ins_w > w * (1.0 - eps):
+                ins_scl = w * (1.0 - eps) / ins_w
+                ins_l = ins_l * ins_scl
+                ins_r = ins_r * ins_scl
+            if ins_h > h * (1.0 - eps):
+                ins_scl = h * (1.0 - eps) / ins_h
+                ins_t = ins_t * ins_scl
+                ins_b = ins_b * ins_scl
+
+            # Keep the inner rectangle past the center of each rounded
+            # corner, so that collapsed inner corners stay inside the
+            # outer arcs.
+            ins_l = min(ins_l, (1.0 - eps) * (w - max(
+                vtr if tr_is_rnd else 0.0, vbr if br_is_rnd else 0.0)))
+            ins_r = min(ins_r, (1.0 - eps) * (w - max(
+                vtl if tl_is_rnd else 0.0, vbl if bl_is_rnd else 0.0)))
+            ins_t = min(ins_t, (1.0 - eps) * (h - max(
+                vbl if bl_is_rnd else 0.0, vbr if br_is_rnd else 0.0)))
+            ins_b = min(ins_b, (1.0 - eps) * (h - max(
+                vtl if tl_is_rnd else 0.0, vtr if tr_is_rnd else 0.0)))
+
+            in_lft = lft + ins_l
+            in_rgt = rgt - ins_r
+            in_btm = btm + ins_b
+            in_top = top - ins_t
+
+            # Inner corners share the outer arc's center. Their radii
+            # shrink by the adjacent insets. When a radius reaches zero,
+            # or the center falls outside the inner rectangle, the inner
+            # corner is a single point: the center, clamped to the inner
+            # rectangle, for rounded corners, else the inner corner.
+            # Corner data: arc center, arc direction, whether theta is
+            # reversed, outer roundness, resolution, inner radii, inner
+            # corner point, outer start and end indices.
+            crnrs = [
+                (lft_ins_0, top_ins_1, -1.0, 1.0, True,
+                 tl_is_rnd, v_tl_res, vtl - ins_l, vtl - ins_t,
+                 in_lft, in_top, tl_crnr_idx_str, tl_crnr_idx_end),
+                (lft_ins_1, btm_ins_1, -1.0, -1.0, False,
+                 bl_is_rnd, v_bl_res, vbl - ins_l, vbl - ins_b,
+                 in_lft, in_btm, bl_crnr_idx_str, bl_crnr_idx_end),
+                (rgt_ins_1, btm_ins_0, 1.0, -1.0, True,
+                 br_is_rnd, v_br_res, vbr - ins_r, vbr - ins_b,
+                 in_rgt, in_btm, br_crnr_idx_str, br_crnr_idx_end),
+                (rgt_ins_0, top_ins_0, 1.0, 1.0, False,
+                 tr_is_rnd, v_tr_res, vtr - ins_r, vtr - ins_t,
+                 in_rgt, in_top, tr_crnr_idx_str, tr_crnr_idx_end)]
+
+            v_indices = []
+            in_strs = [0] * 4
+            in_ends = [0] * 4
+            for c in range(0, 4):
+                cx, cy, sx, sy, rev, \
+                    is_rnd, res, rx, ry, \
+                    px, py, o_str, o_end = crnrs[c]
+
+                in_is_rnd = is_rnd and rx > 0.0 and ry > 0.0 \
+                    and in_lft <= cx <= in_rgt \
+                    and in_btm <= cy <= in_top
+
+                in_str = len(vs)
+                in_strs[c] = in_str
+                if in_is_rnd:
+                    # Unit arc offsets, including the end points, are
+                    # shared between corners of equal resolution.
+                    unit_offs = ((1.0, 0.0),) \
+                        + RndRectMeshMaker.unit_arc(res) \
+                        + ((0.0, 1.0),)
+                    for j in range(0, res + 2):
+                        c_off, s_off = unit_offs[res + 1 - j] if rev \
+                            else unit_offs[j]
+                        x = cx + sx * rx * c_off
+                        y = cy + sy * ry * s_off
+                        u = (x - lft) * w_inv
+                        v = (y - btm) * h_inv
+                        vs.append((x, y, 0.0))
+                        vts.append(((u - 0.5) * u_scl + 0.5,
+                                    (v - 0.5) * v_scl + 0.5))
+
+                    if poly == "NGON":
+                        v_indices.append(
+                            tuple(range(o_str, o_end + 1))
+                            + tuple(range(in_str + res + 1, in_str - 1, -1)))
+                    else:
+                        for b in range(0, res + 1):
+                            a0 = o_str + b
+                            a1 = in_str + b
+                            if poly == "QUAD":
+                                v_indices.append((a0, a0 + 1, a1 + 1, a1))
+                            else:
+                                v_indices.append((a0, a0 + 1, a1 + 1))
+                                v_indices.append((a0, a1 + 1, a1))
+                else:
+                    if is_rnd:
+                        px = min(max(cx, in_lft), in_rgt)
+                        py = min(max(cy, in_btm), in_top)
+                    u = (px - lft) * w_inv
+                    v = (py - btm) * h_inv
+                    vs.append((px, py, 0.0))
+                    vts.append(((u - 0.5) * u_scl + 0.5,
+                                (v - 0.5) * v_scl + 0.5))
+
+                    if poly == "NGON":
+                        v_indices.append(
+                            tuple(range(o_str, o_end + 1)) + (in_str,))
+                    else:
+                        for b in range(o_str, o_end):
+                            v_indices.append((b, b + 1, in_str))
+
+                in_ends[c] = len(vs) - 1
+
+            # Bridge the straight edges: left, bottom, right, top.
+            for c in range(0, 4):
+                d = (c + 1) % 4
+                quad = (crnrs[c][12], crnrs[d][11], in_strs[d], in_ends[c])
+                if poly == "TRI":
+                    # Split along the diagonal inside the quad, as a
+                    # collapsed inner corner can make it concave.
+                    p0 = vs[quad[0]]
+                    p2 = vs[quad[2]]
+                    p3 = vs[quad[3]]
+                    if (p2[0] - p0[0]) * (p3[1] - p0[1]) \
+                            > (p2[1] - p0[1]) * (p3[0] - p0[0]):
+                        v_indices.append((quad[0], quad[1], quad[2]))
+                        v_indices.append((quad[0], quad[2], quad[3]))
+                    else:
+                        v_indices.append((quad[1], quad[2], quad[3]))
+                        v_indices.append((quad[1], quad[3], quad[0]))
+                else:
+                    v_indices.append(quad)
+
+            vn_indices = [(0,) * len(loop) for loop in v_indices]
+        elif poly == "NGON":
             v_arr = [0] * len_vs
             vn_arr = [0] * len_vs
             i_range = range(0, len_vs)
@@ -584,6 +1425,10 @@ class RndRectMeshMaker(bpy.types.Operator):
                 b = tr_crnr_idx_str + i
                 v_indices[j] = (tr_in_crnr_idx, b, b + 1)
 
+        if compact:
+            return RndRectMeshMaker.mesh_data_to_compact(
+                vs, vts, v_indices)
+
         # Return a dictionary containing data.
         return {"vs": vs,
                 "vts": vts,
@@ -592,6 +1437,84 @@ class RndRectMeshMaker(bpy.types.Operator):
                 "vt_indices": v_indices.copy(),
                 "vn_indices": vn_indices}
 
+    @staticmethod
+    def mesh_data_to_compact(vs, vts, v_indices):
+
+        # Packs mesh data into typed arrays: 2D float32 coordinates, as
+        # z is always zero, float32 texture coordinates, and flattened
+        # face indices with a count per face. Texture coordinates share
+        # the vertex indices, as in create_rect_mesh. Indices are 16 bit
+        # when the vertex count allows, 32 bit otherwise. An n-gon's
+        # face size equals the vertex count, so that must fit as well.
+        len_vs = len(vs)
+        idx_type = "H" if len_vs < 65536 else "I"
+        return {"vs": array("f", [c for v in vs for c in (v[0], v[1])]),
+                "vts": array("f", [c for vt in vts for c in vt]),
+                "indices": array(
+                    idx_type, [j for loop in v_indices for j in loop]),
+                "face_sizes": array(
+                    idx_type, [len(loop) for loop in v_indices])}
+
+    @staticmethod
+    def iter_compact_batches(specs, budget=None):
+
+        # Each spec is a dictionary of keyword arguments for
+        # create_rect_mesh. Rectangles are merged into compact chunks.
+        # With a budget, in bytes, a chunk is yielded once its arrays
+        # reach the budget, so memory does not grow with the number of
+        # specs. Indices are relative to the chunk, and rect_starts
+        # holds the first vertex of each of its rectangles.
+        vs = array("f")
+        vts = array("f")
+        indices = array("I")
+        face_sizes = array("I")
+        rect_starts = array("I")
+        len_vs = 0
+
+        for spec in specs:
+            # Chunks are merged from tuples, so override compact output.
+            data = RndRectMeshMaker.create_rect_mesh(
+                **dict(spec, compact=False))
+            rect_starts.append(len_vs)
+            vs.extend(c for v in data["vs"] for c in (v[0], v[1]))
+            vts.extend(c for vt in data["vts"] for c in vt)
+            for loop in data["v_indices"]:
+                indices.extend(j + len_vs for j in loop)
+                face_sizes.append(len(loop))
+            len_vs = len_vs + len(data["vs"])
+
+            if budget is not None:
+                size = vs.itemsize * (len(vs) + len(vts)) \
+                    + indices.itemsize * (len(indices) + len(face_sizes)) \
+                    + rect_starts.itemsize * len(rect_starts)
+                if size >= budget:
+                    yield RndRectMeshMaker.compact_chunk(
+                        vs, vts, indices, face_sizes, rect_starts)
+                    vs = array("f")
+                    vts = array("f")
+                    indices = array("I")
+                    face_sizes = array("I")
+                    rect_starts = array("I")
+                    len_vs = 0
+
+        if len(rect_starts) > 0:
+            yield RndRectMeshMaker.compact_chunk(
+                vs, vts, indices, face_sizes, rect_starts)
+
+    @staticmethod
+    def compact_chunk(vs, vts, indices, face_sizes, rect_starts):
+
+        # Narrow indices to 16 bit when the chunk's vertex count allows.
+        # Face sizes are at most the vertex count.
+        if len(vs) // 2 < 65536:
+            indices = array("H", indices)
+            face_sizes = array("H", face_sizes)
+        return {"vs": vs,
+                "vts": vts,
+                "indices": indices,
+                "face_sizes": face_sizes,
+                "rect_starts": rect_starts}
+
 
 def menu_func(self, context):
     self.layout.operator(RndRectMeshMaker.bl_idname, icon="META_PLANE")
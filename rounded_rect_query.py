@@ -0,0 +1,435 @@
+import bisect
+import functools
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Point queries and outline sampling for rounded rectangles, without
+# Blender. Bounds and rounding are validated as in
+# RndRectMeshMaker.create_rect_mesh, so results agree with the generated
+# meshes at any resolution. Batch queries use numpy when it can be
+# imported, as it can in Blender, and fall back to Python loops.
+
+
+class RoundedRect:
+    """A rounded rectangle with an exact signed distance function"""
+
+    def __init__(
+            self,
+            lbx=-1.7777778, lby=-1.0,
+            ubx=1.7777778, uby=1.0,
+            tl=0.25, tr=0.25,
+            br=0.25, bl=0.25):
+
+        # Constants.
+        eps = 0.000001
+
+        # Validate corners.
+        lft = min(lbx, ubx)
+        rgt = max(lbx, ubx)
+        btm = min(lby, uby)
+        top = max(lby, uby)
+
+        # Protect from zero dimension rectangles.
+        w_inval = abs(rgt - lft) < eps
+        h_inval = abs(top - btm) < eps
+        if w_inval and h_inval:
+            cx = (lft + rgt) * 0.5
+            cy = (top + btm) * 0.5
+            lft = cx - 1.7777778
+            rgt = cx + 1.7777778
+            btm = cy - 1.0
+            top = cy + 1.0
+        elif w_inval:
+            cx = (lft + rgt) * 0.5
+            hh = (top - btm) * 0.5
+            lft = cx - hh
+            rgt = cx + hh
+        elif h_inval:
+            cy = (top + btm) * 0.5
+            wh = (rgt - lft) * 0.5
+            btm = cy - wh
+            top = cy + wh
+
+        # Half the short edge is the maximum corner size. Unrounded
+        # corners are sharp; the mesh's inset for them is topology only.
+        se = 0.5 * min(rgt - lft, top - btm)
+        self.vtl = se * min(abs(tl), 1.0 - eps)
+        self.vtr = se * min(abs(tr), 1.0 - eps)
+        self.vbr = se * min(abs(br), 1.0 - eps)
+        self.vbl = se * min(abs(bl), 1.0 - eps)
+
+        self.lft = lft
+        self.btm = btm
+        self.rgt = rgt
+        self.top = top
+        self.cx = (lft + rgt) * 0.5
+        self.cy = (btm + top) * 0.5
+        self.hw = (rgt - lft) * 0.5
+        self.hh = (top - btm) * 0.5
+
+    def signed_distance(self, x, y):
+        """Distance to the outline, negative inside"""
+
+        # Each corner's arc lies in its own quadrant.
+        dx = x - self.cx
+        dy = y - self.cy
+        if dx > 0.0:
+            r = self.vtr if dy > 0.0 else self.vbr
+        else:
+            r = self.vtl if dy > 0.0 else self.vbl
+
+        qx = abs(dx) - self.hw + r
+        qy = abs(dy) - self.hh + r
+        if qx > 0.0 and qy > 0.0:
+            return math.hypot(qx, qy) - r
+        return max(qx, qy) - r
+
+    def signed_distances(self, points):
+        """Signed distances for a sequence of (x, y) points"""
+
+        # With numpy, points may be any array of shape (n, 2), and
+        # distances are returned as an array.
+        if np is not None:
+            pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+            dx = pts[:, 0] - self.cx
+            dy = pts[:, 1] - self.cy
+            r = np.where(
+                dx > 0.0,
+                np.where(dy > 0.0, self.vtr, self.vbr),
+                np.where(dy > 0.0, self.vtl, self.vbl))
+            qx = np.abs(dx) - self.hw + r
+            qy = np.abs(dy) - self.hh + r
+
+            # Outside both edges, the distance is to the arc. Otherwise,
+            # one of the clamped terms is zero.
+            return np.hypot(np.maximum(qx, 0.0), np.maximum(qy, 0.0)) \
+                + np.minimum(np.maximum(qx, qy), 0.0) - r
+
+        cx = self.cx
+        cy = self.cy
+        hw = self.hw
+        hh = self.hh
+        vtl = self.vtl
+        vtr = self.vtr
+        vbr = self.vbr
+        vbl = self.vbl
+        hypot = math.hypot
+
+        len_points = len(points)
+        ds = [0.0] * len_points
+        for i in range(0, len_points):
+            pt = points[i]
+            dx = pt[0] - cx
+            dy = pt[1] - cy
+            if dx > 0.0:
+                r = vtr if dy > 0.0 else vbr
+            else:
+                r = vtl if dy > 0.0 else vbl
+
+            qx = abs(dx) - hw + r
+            qy = abs(dy) - hh + r
+            if qx > 0.0 and qy > 0.0:
+                ds[i] = hypot(qx, qy) - r
+            else:
+                ds[i] = max(qx, qy) - r
+        return ds
+
+    def contains(self, points):
+        """Whether each of a sequence of (x, y) points is inside"""
+
+        ds = self.signed_distances(points)
+        if np is not None:
+            return ds <= 0.0
+        return [d <= 0.0 for d in ds]
+
+
+class RectGrid:
+    """A uniform grid over the bounds of many rounded rectangles"""
+
+    def __init__(self, rects, cell_size=None):
+        self.rects = list(rects)
+        len_rects = len(self.rects)
+
+        # Default to the mean of the rectangles' longer edges.
+        if cell_size is None:
+            total = 0.0
+            for rect in self.rects:
+                total = total + max(rect.rgt - rect.lft, rect.top - rect.btm)
+            cell_size = total / len_rects if len_rects > 0 else 1.0
+        self.cell_size = max(cell_size, 0.000001)
+        self.cell_inv = 1.0 / self.cell_size
+
+        # Each cell lists the rectangles whose bounds overlap it.
+        cells = {}
+        for i in range(0, len_rects):
+            rect = self.rects[i]
+            i0, j0 = self.cell_of(rect.lft, rect.btm)
+            i1, j1 = self.cell_of(rect.rgt, rect.top)
+            for ci in range(i0, i1 + 1):
+                for cj in range(j0, j1 + 1):
+                    key = (ci, cj)
+                    if key in cells:
+                        cells[key].append(i)
+                    else:
+                        cells[key] = [i]
+        self.cells = cells
+
+        # Range of occupied cells, for bounding searches.
+        self.cell_bounds = (0, 0, 0, 0)
+        if cells:
+            self.cell_bounds = (
+                min(key[0] for key in cells),
+                min(key[1] for key in cells),
+                max(key[0] for key in cells),
+                max(key[1] for key in cells))
+
+    def cell_of(self, x, y):
+        return (math.floor(x * self.cell_inv),
+                math.floor(y * self.cell_inv))
+
+    def query(self, x, y):
+        """Indices of rectangles containing a point"""
+
+        found = []
+        rects = self.rects
+        for i in self.cells.get(self.cell_of(x, y), ()):
+            if rects[i].signed_distance(x, y) <= 0.0:
+                found.append(i)
+        return found
+
+    def query_points(self, points):
+        """Indices of rectangles containing each of a sequence of points"""
+
+        # Group points by cell, so each candidate rectangle is
+        # evaluated over all of its points in one call.
+        by_cell = {}
+        len_points = len(points)
+        for k in range(0, len_points):
+            pt = points[k]
+            key = self.cell_of(pt[0], pt[1])
+            if key in by_cell:
+                by_cell[key].append(k)
+            else:
+                by_cell[key] = [k]
+
+        found = [[] for k in range(0, len_points)]
+        rects = self.rects
+        for key, ks in by_cell.items():
+            candidates = self.cells.get(key, ())
+            if not candidates:
+                continue
+            cell_points = [points[k] for k in ks]
+            for i in candidates:
+                ds = rects[i].signed_distances(cell_points)
+                for m in range(0, len(ks)):
+                    if ds[m] <= 0.0:
+                        found[ks[m]].append(i)
+
+        for hits in found:
+            hits.sort()
+        return found
+
+    def nearest(self, x, y):
+        """Index and signed distance of the closest rectangle"""
+
+        # Search rings of cells outward. A rectangle in a cell at ring
+        # n is at least (n - 1) cells away, so the search stops once
+        # that bound exceeds the best distance found.
+        ci, cj = self.cell_of(x, y)
+        best_i = -1
+        best_d = math.inf
+        if not self.cells:
+            return best_i, best_d
+
+        # Rings closer than the occupied cells are empty, and beyond
+        # the farthest ring there are none.
+        i_min, j_min, i_max, j_max = self.cell_bounds
+        min_ring = max(i_min - ci, ci - i_max, j_min - cj, cj - j_max, 0)
+        max_ring = max(abs(ci - i_min), abs(ci - i_max),
+                       abs(cj - j_min), abs(cj - j_max))
+
+        seen = set()
+        ring = min_ring
+        while ring <= max_ring:
+            if best_i > -1 and (ring - 1) * self.cell_size > best_d:
+                break
+
+            # Walk the ring's perimeter, within the occupied cells: the
+            # bottom and top rows, then the left and right columns
+            # without their corners.
+            keys = []
+            rows = (ci - ring, ci + ring) if ring > 0 else (ci,)
+            cols = (cj - ring, cj + ring) if ring > 0 else ()
+            j0 = max(cj - ring, j_min)
+            j1 = min(cj + ring, j_max)
+            for i in rows:
+                if i_min <= i <= i_max:
+                    keys.extend((i, j) for j in range(j0, j1 + 1))
+            i0 = max(ci - ring + 1, i_min)
+            i1 = min(ci + ring - 1, i_max)
+            for j in cols:
+                if j_min <= j <= j_max:
+                    keys.extend((i, j) for i in range(i0, i1 + 1))
+
+            for key in keys:
+                for i in self.cells.get(key, ()):
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    d = self.rects[i].signed_distance(x, y)
+                    if d < best_d:
+                        best_i = i
+                        best_d = d
+            ring = ring + 1
+        return best_i, best_d
+
+
+class RectOutline:
+    """An arc length table for a rounded rectangle's outline"""
+
+    def __init__(self, rect):
+        self.rect = rect
+        lft = rect.lft
+        btm = rect.btm
+        rgt = rect.rgt
+        top = rect.top
+        vtl = rect.vtl
+        vtr = rect.vtr
+        vbr = rect.vbr
+        vbl = rect.vbl
+        half_pi = math.pi * 0.5
+
+        # The outline is counter-clockwise, starting where the top-left
+        # arc begins, in the same order as the mesh's vertices. Each
+        # segment is a corner arc, given by its center, radius and
+        # start angle, or a straight edge, given by its start point
+        # and direction. Sharp corners have no arc.
+        segs = [
+            ("ARC", lft + vtl, top - vtl, vtl, half_pi),
+            ("LINE", lft, top - vtl, 0.0, -1.0, top - vtl - btm - vbl),
+            ("ARC", lft + vbl, btm + vbl, vbl, math.pi),
+            ("LINE", lft + vbl, btm, 1.0, 0.0, rgt - vbr - lft - vbl),
+            ("ARC", rgt - vbr, btm + vbr, vbr, math.pi + half_pi),
+            ("LINE", rgt, btm + vbr, 0.0, 1.0, top - vtr - btm - vbr),
+            ("ARC", rgt - vtr, top - vtr, vtr, 0.0),
+            ("LINE", rgt - vtr, top, -1.0, 0.0, rgt - vtr - lft - vtl)]
+
+        self.segs = []
+        self.starts = []
+        total = 0.0
+        for seg in segs:
+            if seg[0] == "ARC":
+                seg_len = seg[3] * half_pi
+            else:
+                seg_len = seg[5]
+            if seg_len > 0.0:
+                self.segs.append(seg)
+                self.starts.append(total)
+                total = total + seg_len
+        self.length = total
+
+        # Segment tables as columns, for sampling with numpy. Lines
+        # store a unit radius so that the arc terms stay finite.
+        if np is not None:
+            is_arc = [seg[0] == "ARC" for seg in self.segs]
+            self.np_starts = np.array(self.starts)
+            self.np_is_arc = np.array(is_arc)
+            self.np_x = np.array([seg[1] for seg in self.segs])
+            self.np_y = np.array([seg[2] for seg in self.segs])
+            self.np_r = np.array(
+                [seg[3] if arc else 1.0
+                 for seg, arc in zip(self.segs, is_arc)])
+            self.np_angle = np.array(
+                [seg[4] if arc else 0.0
+                 for seg, arc in zip(self.segs, is_arc)])
+            self.np_dx = np.array(
+                [0.0 if arc else seg[3]
+                 for seg, arc in zip(self.segs, is_arc)])
+            self.np_dy = np.array(
+                [0.0 if arc else seg[4]
+                 for seg, arc in zip(self.segs, is_arc)])
+
+    def sample(self, ts):
+        """Positions and unit tangents at normalized arc lengths"""
+
+        # Parameters wrap, so 1.0 is the start of the outline. With
+        # numpy, positions and tangents are (n, 2) arrays.
+        if np is not None:
+            return self.sample_arrays(ts)
+
+        segs = self.segs
+        starts = self.starts
+        length = self.length
+        last = len(segs) - 1
+        cos = math.cos
+        sin = math.sin
+        search = bisect.bisect_right
+
+        len_ts = len(ts)
+        pts = [(0.0, 0.0)] * len_ts
+        tans = [(0.0, 0.0)] * len_ts
+        for i in range(0, len_ts):
+            s = (ts[i] % 1.0) * length
+            j = min(search(starts, s) - 1, last)
+            seg = segs[j]
+            s_local = s - starts[j]
+            if seg[0] == "ARC":
+                theta = seg[4] + s_local / seg[3]
+                c = cos(theta)
+                d = sin(theta)
+                pts[i] = (seg[1] + seg[3] * c, seg[2] + seg[3] * d)
+                tans[i] = (-d, c)
+            else:
+                pts[i] = (seg[1] + seg[3] * s_local,
+                          seg[2] + seg[4] * s_local)
+                tans[i] = (seg[3], seg[4])
+        return pts, tans
+
+    def sample_arrays(self, ts):
+        """Positions and unit tangents at normalized arc lengths, with numpy"""
+
+        s = np.mod(np.asarray(ts, dtype=np.float64).ravel(), 1.0) \
+            * self.length
+        j = np.clip(
+            np.searchsorted(self.np_starts, s, side="right") - 1,
+            0, len(self.segs) - 1)
+        s_local = s - self.np_starts[j]
+        is_arc = self.np_is_arc[j]
+        r = self.np_r[j]
+
+        # Evaluate both segment kinds, then select per sample.
+        theta = self.np_angle[j] + s_local / r
+        c = np.cos(theta)
+        d = np.sin(theta)
+        dx = self.np_dx[j]
+        dy = self.np_dy[j]
+        pts = np.empty((len(s), 2))
+        tans = np.empty((len(s), 2))
+        pts[:, 0] = self.np_x[j] + np.where(is_arc, r * c, dx * s_local)
+        pts[:, 1] = self.np_y[j] + np.where(is_arc, r * d, dy * s_local)
+        tans[:, 0] = np.where(is_arc, -d, dx)
+        tans[:, 1] = np.where(is_arc, c, dy)
+        return pts, tans
+
+    def sample_even(self, count, offset=0.0):
+        """Evenly spaced positions and tangents around the outline"""
+
+        to_t = 1.0 / max(count, 1)
+        if np is not None:
+            return self.sample_arrays(offset + np.arange(count) * to_t)
+        return self.sample([offset + i * to_t for i in range(0, count)])
+
+
+@functools.lru_cache(maxsize=256)
+def rect_outline(
+        lbx=-1.7777778, lby=-1.0,
+        ubx=1.7777778, uby=1.0,
+        tl=0.25, tr=0.25,
+        br=0.25, bl=0.25):
+    """Finds a cached arc length table for a rounded rectangle"""
+
+    return RectOutline(RoundedRect(lbx, lby, ubx, uby, tl, tr, br, bl))
@@ -0,0 +1,255 @@
+import argparse
+import json
+import sys
+from xml.sax.saxutils import quoteattr
+
+# Writes rounded rectangles as SVG without Blender. Corner math follows
+# RndRectCurveMaker. Blender's y axis points up while SVG's points down,
+# so y coordinates are negated.
+
+
+def rect_bounds(
+        lbx=-1.7777778, lby=-1.0,
+        ubx=1.7777778, uby=1.0,
+        tl=0.25, tr=0.25,
+        br=0.25, bl=0.25):
+    """Validates corners and rounding as the curve add-on does"""
+
+    # Constants.
+    eps = 0.000001
+
+    # Validate corners.
+    lft = min(lbx, ubx)
+    rgt = max(lbx, ubx)
+    btm = min(lby, uby)
+    top = max(lby, uby)
+
+    # Protect from zero dimension rectangles.
+    w = rgt - lft
+    h = top - btm
+    w_inval = w < eps
+    h_inval = h < eps
+    if w_inval and h_inval:
+        cx = (lft + rgt) * 0.5
+        cy = (top + btm) * 0.5
+        lft = cx - 1.7777778
+        rgt = cx + 1.7777778
+        btm = cy - 1.0
+        top = cy + 1.0
+    elif w_inval:
+        cx = (lft + rgt) * 0.5
+        h_half = h * 0.5
+        lft = cx - h_half
+        rgt = cx + h_half
+    elif h_inval:
+        cy = (top + btm) * 0.5
+        w_half = w * 0.5
+        btm = cy - w_half
+        top = cy + w_half
+
+    # Validate corner insetting.
+    # Half the short edge is the maximum size.
+    se = 0.5 * min(rgt - lft, top - btm)
+    vtl = se * min(max(tl, 0.0), 1.0 - eps)
+    vtr = se * min(max(tr, 0.0), 1.0 - eps)
+    vbr = se * min(max(br, 0.0), 1.0 - eps)
+    vbl = se * min(max(bl, 0.0), 1.0 - eps)
+
+    return lft, btm, rgt, top, vtl, vtr, vbr, vbl
+
+
+def fmt_num(x, precision=4):
+    """Formats a number without trailing zeroes"""
+
+    s = "%.*f" % (precision, x)
+    if "." in s:
+        s = s.rstrip("0").rstrip(".")
+    if s == "-0" or s == "":
+        return "0"
+    return s
+
+
+def rect_to_path(
+        lbx=-1.7777778, lby=-1.0,
+        ubx=1.7777778, uby=1.0,
+        tl=0.25, tr=0.25,
+        br=0.25, bl=0.25,
+        precision=4,
+        use_arcs=False):
+    """Creates SVG path data for a rounded rectangle"""
+
+    lft, btm, rgt, top, vtl, vtr, vbr, vbl = rect_bounds(
+        lbx, lby, ubx, uby, tl, tr, br, bl)
+    return bounds_to_path(
+        lft, btm, rgt, top,
+        vtl, vtr, vbr, vbl,
+        precision, use_arcs)
+
+
+def bounds_to_path(
+        lft, btm, rgt, top,
+        vtl, vtr, vbr, vbl,
+        precision=4,
+        use_arcs=False):
+    """Creates SVG path data from validated bounds and corner sizes"""
+
+    # Handle magnitude for a cubic Bezier quarter circle.
+    k = 0.5522847498307936
+
+    # Knots are counter-clockwise from the top-left corner, as in
+    # the curve add-on. Each corner lists its start, end, and the
+    # offsets of its fore and rear handles.
+    crnrs = [
+        (vtl, (lft + vtl, top), (lft, top - vtl), (-1.0, 0.0), (0.0, 1.0)),
+        (vbl, (lft, btm + vbl), (lft + vbl, btm), (0.0, -1.0), (-1.0, 0.0)),
+        (vbr, (rgt - vbr, btm), (rgt, btm + vbr), (1.0, 0.0), (0.0, -1.0)),
+        (vtr, (rgt, top - vtr), (rgt - vtr, top), (0.0, 1.0), (1.0, 0.0))]
+
+    cmds = []
+    for r, co, dest, fh, rh in crnrs:
+        cmds.append("L" if cmds else "M")
+        cmds.append(fmt_num(co[0], precision))
+        cmds.append(fmt_num(-co[1], precision))
+        if r <= 0.0:
+            continue
+
+        if use_arcs:
+            # Visually counter-clockwise is a negative sweep in SVG.
+            rs = fmt_num(r, precision)
+            cmds.append("A")
+            cmds.append(rs)
+            cmds.append(rs)
+            cmds.append("0 0 0")
+        else:
+            rk = r * k
+            cmds.append("C")
+            cmds.append(fmt_num(co[0] + fh[0] * rk, precision))
+            cmds.append(fmt_num(-(co[1] + fh[1] * rk), precision))
+            cmds.append(fmt_num(dest[0] + rh[0] * rk, precision))
+            cmds.append(fmt_num(-(dest[1] + rh[1] * rk), precision))
+        cmds.append(fmt_num(dest[0], precision))
+        cmds.append(fmt_num(-dest[1], precision))
+
+    cmds.append("Z")
+    return " ".join(cmds)
+
+
+def rect_to_element(spec, precision=4, use_arcs=False):
+    """Creates an SVG element for a rectangle specification"""
+
+    # A specification holds the keyword arguments of rect_bounds
+    # and optionally a dictionary of extra element attributes.
+    attrs = spec.get("attrs", None)
+    params = {key: spec[key] for key in (
+        "lbx", "lby", "ubx", "uby", "tl", "tr", "br", "bl") if key in spec}
+
+    lft, btm, rgt, top, vtl, vtr, vbr, vbl = rect_bounds(**params)
+
+    extra = ""
+    if attrs:
+        extra = "".join(" %s=%s" % (key, quoteattr(str(value)))
+                        for key, value in attrs.items())
+
+    # Equal corners simplify to a rect element.
+    if vtl == vtr and vtl == vbr and vtl == vbl:
+        rounding = ""
+        if vtl > 0.0:
+            rs = fmt_num(vtl, precision)
+            rounding = " rx=\"%s\" ry=\"%s\"" % (rs, rs)
+        return "<rect x=\"%s\" y=\"%s\" " \
+            "width=\"%s\" height=\"%s\"%s%s/>" % (
+            fmt_num(lft, precision),
+            fmt_num(-top, precision),
+            fmt_num(rgt - lft, precision),
+            fmt_num(top - btm, precision),
+            rounding,
+            extra)
+
+    d = bounds_to_path(
+        lft, btm, rgt, top,
+        vtl, vtr, vbr, vbl,
+        precision, use_arcs)
+    return "<path d=\"%s\"%s/>" % (d, extra)
+
+
+def write_svg(
+        specs, out,
+        view_box=None,
+        precision=4,
+        use_arcs=False):
+    """Writes an SVG document from an iterable of rectangle specifications"""
+
+    # Specifications are consumed one at a time, so a generator keeps
+    # memory bounded regardless of document size.
+    if view_box is None:
+        out.write("<svg xmlns=\"http://www.w3.org/2000/svg\">\n")
+    else:
+        out.write(
+            "<svg xmlns=\"http://www.w3.org/2000/svg\" "
+            "viewBox=\"%s\">\n" % " ".join(
+                fmt_num(x, precision) for x in view_box))
+
+    count = 0
+    for spec in specs:
+        out.write(rect_to_element(spec, precision, use_arcs))
+        out.write("\n")
+        count = count + 1
+
+    out.write("</svg>\n")
+    return count
+
+
+def read_specs(lines):
+    """Yields rectangle specifications from JSON lines"""
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Writes rounded rectangles from JSON lines to SVG.")
+    parser.add_argument(
+        "input",
+        help="JSON lines file of rectangle specifications, or - for stdin")
+    parser.add_argument(
+        "output",
+        help="SVG file to write, or - for stdout")
+    parser.add_argument(
+        "--view-box",
+        type=float,
+        nargs=4,
+        metavar=("X", "Y", "W", "H"),
+        help="SVG view box, in SVG coordinates")
+    parser.add_argument(
+        "--precision",
+        type=int,
+        default=4,
+        help="Decimal places to write")
+    parser.add_argument(
+        "--arcs",
+        action="store_true",
+        help="Use elliptical arcs instead of cubic Bezier curves")
+    args = parser.parse_args(argv)
+
+    in_file = sys.stdin if args.input == "-" \
+        else open(args.input, "r", encoding="utf-8")
+    out_file = sys.stdout if args.output == "-" \
+        else open(args.output, "w", encoding="utf-8")
+    try:
+        write_svg(
+            read_specs(in_file), out_file,
+            view_box=args.view_box,
+            precision=args.precision,
+            use_arcs=args.arcs)
+    finally:
+        if in_file is not sys.stdin:
+            in_file.close()
+        if out_file is not sys.stdout:
+            out_file.close()
+
+
+if __name__ == "__main__":
+    main()